@@ -23,7 +23,7 @@ mkdir -p ~/.local/share/code-server/User/globalStorage/rooveterinaryinc.roo-clin
 
 # Install Python dependencies
 echo "Installing Python dependencies..."
-pip install hyperliquid-python-sdk
+pip install hyperliquid-python-sdk orjson ijson
 
 # Install Node.js dependencies
 echo "Installing Node.js dependencies..."
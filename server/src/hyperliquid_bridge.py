@@ -2,86 +2,829 @@
 import json
 import sys
 import argparse
+import hashlib
+import itertools
+import math
+import functools
+import threading
+import time
+import random
+import socket
+import signal
+import os
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import eth_account
 from eth_account.signers.local import LocalAccount
 
 # Import Hyperliquid SDK
+from hyperliquid.api import API
 from hyperliquid.exchange import Exchange
 from hyperliquid.info import Info
-from hyperliquid.utils import constants
+from hyperliquid.utils import constants, signing
+from hyperliquid.utils.error import ClientError
 from hyperliquid.utils.types import Cloid
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
 
-def setup_client(secret_key, network="mainnet", account_address=None, skip_ws=True):
-    """Set up the Hyperliquid client with the provided credentials"""
-    base_url = constants.MAINNET_API_URL if network == "mainnet" else constants.TESTNET_API_URL
+# ijson is optional; it lets batch commands start sending before a large order list is fully read
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# orjson is optional; it encodes and decodes large market data payloads several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data):
+    """Decode JSON from str or bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def json_dumps(obj):
+    """Encode an object as JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj).encode()
+
+class RawJSON(bytes):
+    """An API response body that is already JSON and is written out without re-encoding"""
+
+def encode_result(result):
+    """Encode a command result, passing raw response bodies through untouched"""
+    if isinstance(result, RawJSON):
+        return bytes(result)
+    return json_dumps(result)
+
+def write_json(obj):
+    """Write an object to stdout as a single JSON line"""
+    try:
+        data = encode_result(obj)
+    except Exception as e:
+        data = json_dumps({"error": f"Could not encode result: {e}"})
+    sys.stdout.buffer.write(data + b"\n")
+    sys.stdout.buffer.flush()
+
+# Daemon requests are handled concurrently; each response line is written whole
+_write_lock = threading.Lock()
+
+# The real stdout while serving; sys.stdout then points at stderr so library prints stay off it
+_response_out = None
+
+def write_response(request_id, result):
+    """Write a daemon response envelope, splicing in the encoded result"""
+    try:
+        data = b'{"id":' + json_dumps(request_id) + b',"result":' + encode_result(result) + b"}"
+    except Exception as e:
+        data = json_dumps({"id": request_id, "result": {"error": f"Could not encode result: {e}"}})
+    with _write_lock:
+        _response_out.write(data + b"\n")
+        _response_out.flush()
+
+# EIP-712 domain separators by domain, hashed once instead of for every signature
+_domain_hashes = {}
+
+def install_signing_cache():
+    """Patch the SDK's sign_inner to reuse hashed EIP-712 domain separators.
+    
+    This relies on eth_account internals, so the patch is only installed when it
+    reproduces encode_typed_data exactly for a sample L1 action; otherwise the SDK
+    keeps signing as before.
+    """
+    try:
+        from eth_account.messages import SignableMessage, encode_typed_data
+        from eth_account._utils.encode_typed_data.encoding_and_hashing import hash_domain, hash_eip712_message
+        from eth_utils import to_hex
+        
+        def signable_message(data):
+            domain = data["domain"]
+            key = tuple(sorted(domain.items()))
+            domain_hash = _domain_hashes.get(key)
+            if domain_hash is None:
+                domain_hash = _domain_hashes[key] = hash_domain(domain)
+            types = {name: fields for name, fields in data["types"].items() if name != "EIP712Domain"}
+            return SignableMessage(b"\x01", domain_hash, hash_eip712_message(types, data["message"]))
+        
+        sample = signing.l1_payload(signing.construct_phantom_agent(b"\x00" * 32, True))
+        if tuple(signable_message(sample)) != tuple(encode_typed_data(full_message=sample)):
+            return
+    except Exception:
+        return
+    
+    def sign_inner(wallet, data):
+        signed = wallet.sign_message(signable_message(data))
+        return {"r": to_hex(signed["r"]), "s": to_hex(signed["s"]), "v": signed["v"]}
+    
+    signing.sign_inner = sign_inner
+
+# Set while serving daemon requests, when stdin carries the request stream
+_serving = False
+
+# Read-only Info clients by network, reused across daemon requests
+_infos = {}
+
+# Exchange clients keyed by (secret key hash, network, account address), reused across daemon requests
+_clients = OrderedDict()
+_clients_lock = threading.Lock()
+MAX_CACHED_CLIENTS = 32
+
+# Probe idle connections so they are not silently dropped between sparse calls
+TCP_KEEPALIVE_OPTIONS = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+for _name, _value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPALIVE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3)):
+    if hasattr(socket, _name):
+        TCP_KEEPALIVE_OPTIONS.append((socket.IPPROTO_TCP, getattr(socket, _name), _value))
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter that enables TCP keepalive on its connections"""
     
-    account: LocalAccount = eth_account.Account.from_key(secret_key)
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + TCP_KEEPALIVE_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
+def create_session():
+    """Create a session with a pooled HTTPS adapter so connections are kept alive and reused"""
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    # POST is not in Retry's allowed methods, so only connection failures are retried
+    session.mount("https://", KeepAliveAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    ))
+    return session
+
+# One session shared by every Info and Exchange in this process
+_session = create_session()
+
+# Seconds each HTTP request may take, so a stalled server fails the call instead of holding a worker
+HTTP_TIMEOUT = 10
+
+def share_session(*apis):
+    """Point SDK API objects at the shared session, closing the ones they created"""
+    for api in apis:
+        if api.session is not _session:
+            api.session.close()
+            api.session = _session
+
+def base_url_for(network):
+    """Get the API URL for a network"""
+    return constants.MAINNET_API_URL if network == "mainnet" else constants.TESTNET_API_URL
+
+def fetch_universe(network):
+    """Get meta and spot_meta for a network through the metadata cache.
+    
+    The SDK resolves coin names to asset indices from the meta and spot_meta it is
+    constructed with, so passing these in stops every Info and Exchange from
+    fetching them again.
+    """
+    api = API(base_url_for(network), timeout=HTTP_TIMEOUT)
+    share_session(api)
+    meta = get_cached_meta(api, network, "meta", lambda: api.post("/info", {"type": "meta"}))
+    spot_meta = get_cached_meta(api, network, "spot_meta", lambda: api.post("/info", {"type": "spotMeta"}))
+    return meta, spot_meta
+
+def setup_info(network="mainnet"):
+    """Set up a read-only Info client for a network, reusing a cached one if available"""
+    with _clients_lock:
+        info = _infos.get(network)
+    if info is not None:
+        return info
+    
+    # Fetched outside the lock so a stalled request does not hold up callers of other clients
+    meta, spot_meta = fetch_universe(network)
+    info = Info(base_url_for(network), True, meta, spot_meta, timeout=HTTP_TIMEOUT)
+    share_session(info)
+    with _clients_lock:
+        return _infos.setdefault(network, info)
+
+def setup_exchange(secret_key, network="mainnet", account_address=None):
+    """Set up a signing Exchange client with the provided credentials, reusing a cached one if available"""
+    key = (hashlib.sha256(secret_key.encode()).hexdigest(), network, account_address)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            _clients.move_to_end(key)
+            return client
+    
+    account: LocalAccount = account_from_key(secret_key)
     address = account_address if account_address else account.address
+    meta, spot_meta = fetch_universe(network)
+    exchange = Exchange(account, base_url_for(network), meta=meta, account_address=address, spot_meta=spot_meta, timeout=HTTP_TIMEOUT)
+    share_session(exchange, exchange.info)
     
-    info = Info(base_url, skip_ws)
-    exchange = Exchange(account, base_url, account_address=address)
+    with _clients_lock:
+        # Another request may have built the same client while this one was fetching
+        client = _clients.setdefault(key, (address, exchange))
+        _clients.move_to_end(key)
+        if len(_clients) > MAX_CACHED_CLIENTS:
+            _clients.popitem(last=False)
+        return client
+
+def user_address(secret_key, account_address=None):
+    """Get the address whose data is queried, deriving it from the key only when no account address is given"""
+    if account_address:
+        return account_address
+    return account_from_key(secret_key).address
+
+@functools.lru_cache(maxsize=8)
+def account_from_key(secret_key):
+    """Derive the signing account for a private key, once per key"""
+    return eth_account.Account.from_key(secret_key)
+
+def forget_network_meta(network):
+    """Drop cached metadata, clients and websocket feeds for a network so the next call sees new listings"""
+    with _clients_lock:
+        _infos.pop(network, None)
+        for key in [key for key in _clients if key[1] == network]:
+            del _clients[key]
+    for data_type in ("meta", "spot_meta"):
+        _meta_cache.pop((network, data_type), None)
+    
+    with _ws_lock:
+        ws_info = pop_ws_feeds(network)
+    disconnect_ws_info(ws_info)
+
+def refresh_network_meta(network, coin):
+    """Refetch a network's universe and, if it now lists coin, replace the cached metadata and clients.
+    
+    Returns whether coin is listed, so an unknown coin costs one metadata refetch
+    instead of every cached client.
+    """
+    api = API(base_url_for(network), timeout=HTTP_TIMEOUT)
+    share_session(api)
+    meta = api.post("/info", {"type": "meta"})
+    spot_meta = api.post("/info", {"type": "spotMeta"})
+    if coin not in Info(api.base_url, True, meta, spot_meta, timeout=HTTP_TIMEOUT).name_to_coin:
+        return False
+    
+    forget_network_meta(network)
+    now = time.monotonic()
+    _meta_cache[(network, "meta")] = (now, meta, META_CACHE_POLICY["meta"][0])
+    _meta_cache[(network, "spot_meta")] = (now, spot_meta, META_CACHE_POLICY["spot_meta"][0])
+    return True
+
+def with_fresh_meta(fn):
+    """Retry a command once with refetched metadata when a coin is missing from the cached universe.
+    
+    The SDK raises KeyError with the coin name; the command is only retried when
+    the refetched universe lists that coin.
+    """
+    @functools.wraps(fn)
+    def wrapper(args, *rest):
+        try:
+            return fn(args, *rest)
+        except KeyError as e:
+            coin = e.args[0] if e.args else None
+            if not isinstance(coin, str) or not refresh_network_meta(args.network, coin):
+                raise
+        return fn(args, *rest)
+    return wrapper
+
+# Hit, miss and eviction counters per cache, reported by cache-stats
+_cache_stats = {
+    "meta": {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0},
+    "all_mids": {"hits": 0, "misses": 0, "evictions": 0},
+    "user_state": {"hits": 0, "misses": 0, "evictions": 0},
+}
+
+# Latest all_mids response per network as (fetched_at, mids)
+_all_mids_cache = {}
+ALL_MIDS_TTL = 1.0
+
+# Latest websocket payloads per (network, subscription key) as (received_at, data)
+_ws_state = {}
+_ws_infos = {}
+# Open subscriptions per (network, subscription key) as (subscription, subscription id), least recently read first
+_ws_subscriptions = OrderedDict()
+_ws_lock = threading.Lock()
+WS_MAX_AGE = 2.0
+# Order book feeds kept open at once; the least recently read one is closed to make room
+MAX_L2_BOOK_SUBSCRIPTIONS = 20
+
+def pop_ws_feeds(network):
+    """Drop a network's websocket Info, subscriptions and latest payloads, returning the Info.
     
-    return address, info, exchange
+    Must be called with _ws_lock held.
+    """
+    ws_info = _ws_infos.pop(network, None)
+    for key in [key for key in _ws_subscriptions if key[0] == network]:
+        del _ws_subscriptions[key]
+        _ws_state.pop(key, None)
+    return ws_info
 
+def disconnect_ws_info(ws_info):
+    """Close the websocket of an Info dropped by pop_ws_feeds, if any"""
+    if ws_info is not None:
+        try:
+            ws_info.disconnect_websocket()
+        except Exception:
+            pass
+
+def get_ws_info(info, network):
+    """Get the websocket-enabled Info for a network, creating it on first use.
+    
+    The SDK does not reconnect a dropped websocket, so once its thread has exited the
+    network's feeds are dropped and a new connection is opened.
+    """
+    dead = None
+    with _ws_lock:
+        ws_info = _ws_infos.get(network)
+        if ws_info is not None and not ws_info.ws_manager.is_alive():
+            dead = pop_ws_feeds(network)
+            ws_info = None
+        if ws_info is None:
+            ws_info = _ws_infos[network] = Info(
+                info.base_url,
+                False,
+                get_cached_meta(info, network, "meta"),
+                get_cached_meta(info, network, "spot_meta"),
+                timeout=HTTP_TIMEOUT
+            )
+            share_session(ws_info)
+    disconnect_ws_info(dead)
+    return ws_info
+
+def subscribe(info, network, subscription, key, extract):
+    """Keep the latest payload of a websocket subscription in _ws_state"""
+    # Looked up first so the entries of a dropped connection are cleared before checking for one
+    ws_info = get_ws_info(info, network)
+    with _ws_lock:
+        if (network, key) in _ws_subscriptions:
+            _ws_subscriptions.move_to_end((network, key))
+            return
+        _ws_subscriptions[(network, key)] = None
+    
+    def on_message(message):
+        # Updates may still arrive for a subscription that was just closed
+        if (network, key) in _ws_subscriptions:
+            _ws_state[(network, key)] = (time.monotonic(), extract(message["data"]))
+    
+    try:
+        subscription_id = ws_info.subscribe(dict(subscription), on_message)
+    except Exception:
+        with _ws_lock:
+            _ws_subscriptions.pop((network, key), None)
+        raise
+    
+    with _ws_lock:
+        if _ws_infos.get(network) is not ws_info:
+            # The connection was replaced meanwhile, so this subscription is on a dead one
+            _ws_subscriptions.pop((network, key), None)
+        elif (network, key) in _ws_subscriptions:
+            _ws_subscriptions[(network, key)] = (subscription, subscription_id)
+        closing = pop_least_read_l2_books()
+    for (closing_network, _), (closing_subscription, closing_id) in closing:
+        try:
+            _ws_infos[closing_network].unsubscribe(dict(closing_subscription), closing_id)
+        except Exception:
+            pass
+
+def pop_least_read_l2_books():
+    """Drop the least recently read order book subscriptions beyond MAX_L2_BOOK_SUBSCRIPTIONS, returning them.
+    
+    Must be called with _ws_lock held.
+    """
+    l2_books = [key for key, entry in _ws_subscriptions.items() if key[1].startswith("l2Book:") and entry is not None]
+    closing = []
+    for key in l2_books[:max(0, len(l2_books) - MAX_L2_BOOK_SUBSCRIPTIONS)]:
+        closing.append((key, _ws_subscriptions.pop(key)))
+        _ws_state.pop(key, None)
+    return closing
+
+def get_streamed(info, network, subscription, key, extract):
+    """Get the latest websocket payload for a subscription, or None if it is missing or stale.
+    
+    Subscriptions are only opened in daemon mode, on first use; until the first update
+    arrives callers fall back to REST.
+    """
+    if not _serving:
+        return None
+    try:
+        subscribe(info, network, subscription, key, extract)
+    except Exception:
+        return None
+    entry = _ws_state.get((network, key))
+    if entry is not None and time.monotonic() - entry[0] < WS_MAX_AGE:
+        return entry[1]
+    return None
+
+def all_mids_feed():
+    """Get the allMids subscription, its state key and payload extractor"""
+    return {"type": "allMids"}, "allMids", lambda data: data["mids"]
+
+def l2_book_feed(coin):
+    """Get the l2Book subscription for a coin, its state key and payload extractor"""
+    return {"type": "l2Book", "coin": coin}, f"l2Book:{coin}", lambda data: data
+
+def streamed_all_mids(info, network):
+    """Get mid prices from the allMids websocket feed"""
+    return get_streamed(info, network, *all_mids_feed())
+
+def streamed_l2_book(info, network, coin):
+    """Get an order book from the l2Book websocket feed"""
+    return get_streamed(info, network, *l2_book_feed(coin))
+
+def get_all_mids(info, network):
+    """Get mid prices for all coins from the websocket feed, or from a REST response fetched within the last ALL_MIDS_TTL seconds"""
+    mids = streamed_all_mids(info, network)
+    if mids is not None:
+        return mids
+    
+    cached = _all_mids_cache.get(network)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < ALL_MIDS_TTL:
+        _cache_stats["all_mids"]["hits"] += 1
+        return cached[1]
+    
+    _cache_stats["all_mids"]["misses"] += 1
+    mids = info.all_mids()
+    _all_mids_cache[network] = (now, mids)
+    return mids
+
+# Cached metadata per (network, data type) as (fetched_at, value, ttl)
+_meta_cache = {}
+_meta_cache_lock = threading.Lock()
+_meta_refreshing = set()
+
+# Seconds each data type stays fresh, and how much longer a stale value may be served while refreshing
+META_CACHE_POLICY = {
+    "meta": (3600, 600),
+    "spot_meta": (3600, 600),
+    "meta_and_asset_ctxs": (5, 5),
+    "spot_meta_and_asset_ctxs": (5, 5),
+}
+
+def get_cached_meta(info, network, data_type, fetch=None):
+    """Get exchange metadata, serving stale values while a background thread refreshes them"""
+    ttl, stale = META_CACHE_POLICY[data_type]
+    key = (network, data_type)
+    fetch = fetch or getattr(info, data_type)
+    
+    def refresh():
+        try:
+            value = fetch()
+            _meta_cache[key] = (time.monotonic(), value, ttl)
+        except Exception:
+            pass
+        finally:
+            with _meta_cache_lock:
+                _meta_refreshing.discard(key)
+    
+    entry = _meta_cache.get(key)
+    if entry is not None:
+        age = time.monotonic() - entry[0]
+        if age < ttl:
+            _cache_stats["meta"]["hits"] += 1
+            return entry[1]
+        if age < ttl + stale:
+            _cache_stats["meta"]["stale_hits"] += 1
+            with _meta_cache_lock:
+                if key not in _meta_refreshing:
+                    _meta_refreshing.add(key)
+                    threading.Thread(target=refresh, daemon=True).start()
+            return entry[1]
+    
+    _cache_stats["meta"]["misses"] += 1
+    value = fetch()
+    _meta_cache[key] = (time.monotonic(), value, ttl)
+    return value
+
+def get_cache_stats(args):
+    """Report hit rates, entry counts and evictions for the in-process caches"""
+    caches = {"meta": _meta_cache, "all_mids": _all_mids_cache, "user_state": _state_cache}
+    report = {}
+    for name, stats in _cache_stats.items():
+        hits = stats["hits"] + stats.get("stale_hits", 0)
+        lookups = hits + stats["misses"]
+        report[name] = {
+            **stats,
+            "hit_rate": hits / lookups if lookups else None,
+            "entries": len(caches[name]),
+        }
+    return report
+
+def post_raw(api, url_path, payload):
+    """POST to the API like API.post, but return the undecoded response body"""
+    response = api.session.post(api.base_url + url_path, json=payload, timeout=HTTP_TIMEOUT)
+    api._handle_exception(response)
+    body = response.content
+    stripped = body.strip()
+    if (stripped[:1] not in (b"[", b"{", b'"') and stripped != b"null") or b"\n" in body:
+        # Decode anything that is not plainly one line of JSON, so each response stays one valid line
+        try:
+            return json_loads(body)
+        except ValueError:
+            return {"error": f"Could not parse JSON: {response.text}"}
+    return RawJSON(body)
+
+def get_l2_snapshot(info, args):
+    """Get an order book, from the websocket feed when available"""
+    book = streamed_l2_book(info, args.network, args.coin)
+    if book is not None:
+        return book
+    return post_raw(info, "/info", {"type": "l2Book", "coin": info.name_to_coin[args.coin]})
+
+def get_candles(info, args):
+    """Get candles for a coin"""
+    req = {"coin": info.name_to_coin[args.coin], "interval": args.interval, "startTime": args.start_time, "endTime": args.end_time}
+    return post_raw(info, "/info", {"type": "candleSnapshot", "req": req})
+
+def get_funding_history(info, args):
+    """Get funding history for a coin"""
+    payload = {"type": "fundingHistory", "coin": info.name_to_coin[args.coin], "startTime": args.start_time}
+    if args.end_time is not None:
+        payload["endTime"] = args.end_time
+    return post_raw(info, "/info", payload)
+
+# Market data type -> handler(info, args)
+MARKET_DATA = {
+    "all_mids": lambda info, args: get_all_mids(info, args.network),
+    "l2_snapshot": get_l2_snapshot,
+    "meta": lambda info, args: get_cached_meta(info, args.network, "meta"),
+    "meta_and_asset_ctxs": lambda info, args: get_cached_meta(info, args.network, "meta_and_asset_ctxs"),
+    "spot_meta": lambda info, args: get_cached_meta(info, args.network, "spot_meta"),
+    "spot_meta_and_asset_ctxs": lambda info, args: get_cached_meta(info, args.network, "spot_meta_and_asset_ctxs"),
+    "candles": get_candles,
+    "funding_history": get_funding_history,
+}
+
+@with_fresh_meta
 def get_market_data(args):
     """Get market data from Hyperliquid"""
-    _, info, _ = setup_client(args.secret_key, args.network)
-    
-    if args.data_type == "all_mids":
-        return info.all_mids()
-    elif args.data_type == "l2_snapshot":
-        return info.l2_snapshot(args.coin)
-    elif args.data_type == "meta":
-        return info.meta()
-    elif args.data_type == "meta_and_asset_ctxs":
-        return info.meta_and_asset_ctxs()
-    elif args.data_type == "spot_meta":
-        return info.spot_meta()
-    elif args.data_type == "spot_meta_and_asset_ctxs":
-        return info.spot_meta_and_asset_ctxs()
-    elif args.data_type == "candles":
-        return info.candles_snapshot(args.coin, args.interval, args.start_time, args.end_time)
-    elif args.data_type == "funding_history":
-        return info.funding_history(args.coin, args.start_time, args.end_time)
-    else:
+    handler = MARKET_DATA.get(args.data_type)
+    if handler is None:
         return {"error": f"Unknown data type: {args.data_type}"}
+    
+    info = setup_info(args.network)
+    return handler(info, args)
+
+# Latest user_state per (network, address) as (fetched_at, state)
+_state_cache = {}
+_state_locks = {}
+_state_locks_lock = threading.Lock()
+USER_STATE_TTL = 0.5
+# Bumped after every exchange action; a state whose fetch spans a bump may predate the action and is not cached
+_state_generation = 0
+
+def get_user_state(info, network, address):
+    """Get a user's clearinghouse state, sharing one request between callers within USER_STATE_TTL seconds"""
+    key = (network, address)
+    while True:
+        with _state_locks_lock:
+            lock = _state_locks.setdefault(key, threading.Lock())
+        
+        with lock:
+            if _state_locks.get(key) is not lock:
+                # Evicted by compact_caches before we acquired it; callers must share one lock
+                continue
+            cached = _state_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < USER_STATE_TTL:
+                _cache_stats["user_state"]["hits"] += 1
+                return cached[1]
+            
+            _cache_stats["user_state"]["misses"] += 1
+            generation = _state_generation
+            state = info.user_state(address)
+            with _state_locks_lock:
+                if generation == _state_generation:
+                    _state_cache[key] = (time.monotonic(), state)
+            return state
+
+def get_account_snapshot(args):
+    """Get positions, balance and margin summary from a single clearinghouse state query"""
+    address = user_address(args.secret_key, args.account_address)
+    info = setup_info(args.network)
+    
+    state = get_user_state(info, args.network, address)
+    return {
+        "positions": state["assetPositions"],
+        "balance": state["marginSummary"]["accountValue"],
+        "margin": state["marginSummary"],
+        "withdrawable": state["withdrawable"],
+    }
+
+# User data type -> handler(info, address, args)
+USER_DATA = {
+    "user_state": lambda info, address, args: get_user_state(info, args.network, address),
+    "spot_user_state": lambda info, address, args: info.spot_user_state(address),
+    "open_orders": lambda info, address, args: info.open_orders(address),
+    "frontend_open_orders": lambda info, address, args: info.frontend_open_orders(address),
+    "user_fills": lambda info, address, args: info.user_fills(address),
+    "user_fills_by_time": lambda info, address, args: info.user_fills_by_time(address, args.start_time, args.end_time),
+    "user_funding_history": lambda info, address, args: info.user_funding_history(address, args.start_time, args.end_time),
+    "user_fees": lambda info, address, args: info.user_fees(address),
+    "user_staking_summary": lambda info, address, args: info.user_staking_summary(address),
+    "user_staking_delegations": lambda info, address, args: info.user_staking_delegations(address),
+    "user_staking_rewards": lambda info, address, args: info.user_staking_rewards(address),
+    "query_sub_accounts": lambda info, address, args: info.query_sub_accounts(address),
+}
 
 def get_user_data(args):
     """Get user-specific data from Hyperliquid"""
-    address, info, _ = setup_client(args.secret_key, args.network, args.account_address)
-    
-    if args.data_type == "user_state":
-        return info.user_state(address)
-    elif args.data_type == "spot_user_state":
-        return info.spot_user_state(address)
-    elif args.data_type == "open_orders":
-        return info.open_orders(address)
-    elif args.data_type == "frontend_open_orders":
-        return info.frontend_open_orders(address)
-    elif args.data_type == "user_fills":
-        return info.user_fills(address)
-    elif args.data_type == "user_fills_by_time":
-        return info.user_fills_by_time(address, args.start_time, args.end_time)
-    elif args.data_type == "user_funding_history":
-        return info.user_funding_history(address, args.start_time, args.end_time)
-    elif args.data_type == "user_fees":
-        return info.user_fees(address)
-    elif args.data_type == "user_staking_summary":
-        return info.user_staking_summary(address)
-    elif args.data_type == "user_staking_delegations":
-        return info.user_staking_delegations(address)
-    elif args.data_type == "user_staking_rewards":
-        return info.user_staking_rewards(address)
-    elif args.data_type == "query_sub_accounts":
-        return info.query_sub_accounts(address)
-    else:
+    handler = USER_DATA.get(args.data_type)
+    if handler is None:
         return {"error": f"Unknown data type: {args.data_type}"}
+    
+    address = user_address(args.secret_key, args.account_address)
+    info = setup_info(args.network)
+    return handler(info, address, args)
 
-def place_order(args):
-    """Place an order on Hyperliquid"""
-    _, _, exchange = setup_client(args.secret_key, args.network, args.account_address)
+def get_prices_bulk(args):
+    """Get mid prices for a list of coins from a single all_mids query"""
+    info = setup_info(args.network)
     
-    order_type = json.loads(args.order_type)
+    mids = get_all_mids(info, args.network)
+    coins = [coin.strip() for coin in args.coins.split(",") if coin.strip()]
+    return {coin: mids[coin] for coin in coins if coin in mids}
+
+# Worker pool for info-batch; sized to the connection pool mounted in create_session
+_batch_executor = ThreadPoolExecutor(max_workers=16)
+
+@with_fresh_meta
+def subscribe_market_data(args):
+    """Open a websocket subscription ahead of time so later reads are served from it"""
+    if not _serving:
+        return {"error": "Subscriptions are only available in daemon mode"}
+    if args.data_type == "all_mids":
+        feed = all_mids_feed()
+    elif args.data_type == "l2_snapshot":
+        if not args.coin:
+            return {"error": "--coin is required for l2_snapshot"}
+        feed = l2_book_feed(args.coin)
+    else:
+        return {"error": f"Unsupported subscription data type: {args.data_type}"}
+    
+    # Subscribed directly rather than through get_streamed, so failures reach the caller
+    info = setup_info(args.network)
+    if args.data_type == "l2_snapshot" and args.coin not in info.name_to_coin:
+        # A KeyError lets with_fresh_meta retry once the coin is listed
+        raise KeyError(args.coin)
+    subscribe(info, args.network, *feed)
+    return {"subscribed": args.data_type}
+
+# Query fields info-batch copies onto each query's arguments
+BATCH_QUERY_FIELDS = ("data_type", "coin", "interval", "start_time", "end_time")
+
+# Upper bound on the queries a single info-batch command will run
+MAX_INFO_BATCH_SIZE = 50
+
+def get_data_batch(args):
+    """Run several market-data/user-data queries concurrently and return their results in order"""
+    queries = json_loads(args.requests_json)
+    if not isinstance(queries, list) or not all(isinstance(query, dict) for query in queries):
+        raise ValueError("Expected a JSON list of query objects")
+    if len(queries) > MAX_INFO_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_INFO_BATCH_SIZE} queries are accepted per command")
+    
+    def run(query):
+        unknown = set(query) - {"command", *BATCH_QUERY_FIELDS}
+        if unknown:
+            return {"error": f"Unknown query fields: {', '.join(sorted(unknown))}"}
+        if not query.get("data_type"):
+            return {"error": "data_type is required"}
+        command = query.get("command") or "market-data"
+        if command not in ("market-data", "user-data"):
+            return {"error": f"Unknown command: {command}"}
+        
+        query_args = argparse.Namespace(**vars(args))
+        for key in BATCH_QUERY_FIELDS:
+            setattr(query_args, key, query.get(key))
+        try:
+            if command == "user-data":
+                return get_user_data(query_args)
+            result = get_market_data(query_args)
+            if isinstance(result, RawJSON):
+                return json_loads(bytes(result))
+            return result
+        except Exception as e:
+            return {"error": str(e)}
+    
+    return list(_batch_executor.map(run, queries))
+
+class RateLimiter:
+    """Token bucket allowing max_calls per period seconds, blocking callers when empty"""
+    
+    def __init__(self, max_calls, period):
+        self.capacity = max_calls
+        self.rate = max_calls / period
+        self.tokens = float(max_calls)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0
+            self.tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+
+# Shared across all exchange actions sent by this process
+_exchange_limiter = RateLimiter(max_calls=20, period=1)
+
+def check_deadline(args):
+    """Fail before sending an exchange action once the request's deadline has passed"""
+    deadline = getattr(args, "deadline", None)
+    if deadline is not None and time.time() * 1000 > deadline:
+        raise TimeoutError("Request deadline passed before the action was sent")
+
+def with_backoff(fn):
+    """Rate limit an exchange command and retry it with exponential backoff when the API answers 429.
+    
+    In daemon mode nothing is sent after the request's deadline, and a backoff that
+    would end past it fails instead of waiting.
+    """
+    @functools.wraps(fn)
+    def wrapper(args, *rest, **kwargs):
+        deadline = getattr(args, "deadline", None)
+        delay = 2.0
+        for attempt in range(5):
+            _exchange_limiter.acquire()
+            check_deadline(args)
+            try:
+                return fn(args, *rest, **kwargs)
+            except ClientError as e:
+                if e.status_code != 429 or attempt == 4:
+                    raise
+                wait = delay + random.random() * 0.5
+                if deadline is not None and (time.time() + wait) * 1000 > deadline:
+                    raise
+            time.sleep(wait)
+            delay = min(delay * 2, 30)
+    return wrapper
+
+def invalidates_user_state(fn):
+    """Drop cached clearinghouse states after an exchange action, since positions and margin may have changed"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        global _state_generation
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with _state_locks_lock:
+                _state_generation += 1
+                _state_cache.clear()
+    return wrapper
+
+# The SDK uses the current time in milliseconds as each action's nonce, so concurrent
+# daemon requests signed by the same key could otherwise send two actions with one nonce
+_signer_locks = {}
+_signer_locks_lock = threading.Lock()
+
+def one_action_per_signer(fn):
+    """Send the exchange actions signed by one key one at a time, passing fn the signer's Exchange.
+    
+    When the request has a deadline, the action is signed with it as expiresAfter, so
+    the exchange itself rejects an action that only arrives after the caller gave up.
+    """
+    @functools.wraps(fn)
+    def wrapper(args, *rest):
+        key = hashlib.sha256(args.secret_key.encode()).hexdigest()
+        with _signer_locks_lock:
+            lock = _signer_locks.setdefault(key, threading.Lock())
+        with lock:
+            # Waiting for the signer's earlier actions may have used up the deadline
+            check_deadline(args)
+            _, exchange = setup_exchange(args.secret_key, args.network, args.account_address)
+            deadline = getattr(args, "deadline", None)
+            exchange.set_expires_after(int(deadline) if deadline is not None else None)
+            try:
+                return fn(args, exchange, *rest)
+            finally:
+                # Clients are shared, so the next action must not inherit this request's deadline
+                exchange.set_expires_after(None)
+    return wrapper
+
+def exchange_action(fn):
+    """Wrap a command that signs and sends an exchange action.
+    
+    From the outside in: invalidate cached user states, rate limit and back off on 429,
+    retry once with refetched metadata for new coins, and send one action per signer at a time.
+    The wrapped function is called as fn(args, exchange, *rest).
+    """
+    return invalidates_user_state(with_backoff(with_fresh_meta(one_action_per_signer(fn))))
+
+@functools.lru_cache(maxsize=128)
+def parse_json(value):
+    """Parse a small JSON argument such as an order type, reusing results for repeated strings.
+    
+    The returned object is shared between calls and must not be modified.
+    """
+    return json_loads(value)
+
+@exchange_action
+def place_order(args, exchange):
+    """Place an order on Hyperliquid"""
+    order_type = parse_json(args.order_type)
     
     cloid = None
     if args.cloid:
@@ -89,7 +832,7 @@ def place_order(args):
     
     builder = None
     if args.builder:
-        builder = json.loads(args.builder)
+        builder = parse_json(args.builder)
     
     return exchange.order(
         args.coin,
@@ -102,17 +845,16 @@ def place_order(args):
         builder
     )
 
-def place_market_order(args):
+@exchange_action
+def place_market_order(args, exchange):
     """Place a market order on Hyperliquid"""
-    _, _, exchange = setup_client(args.secret_key, args.network, args.account_address)
-    
     cloid = None
     if args.cloid:
         cloid = Cloid(args.cloid)
     
     builder = None
     if args.builder:
-        builder = json.loads(args.builder)
+        builder = parse_json(args.builder)
     
     return exchange.market_open(
         args.coin,
@@ -124,36 +866,214 @@ def place_market_order(args):
         builder
     )
 
-def cancel_order(args):
+@exchange_action
+def cancel_order(args, exchange):
     """Cancel an order on Hyperliquid"""
-    _, _, exchange = setup_client(args.secret_key, args.network, args.account_address)
-    
     if args.cloid:
         cloid = Cloid(args.cloid)
         return exchange.cancel_by_cloid(args.coin, cloid)
     else:
         return exchange.cancel(args.coin, int(args.oid))
 
-def update_leverage(args):
-    """Update leverage for a coin"""
-    _, _, exchange = setup_client(args.secret_key, args.network, args.account_address)
+# Hyperliquid accepts at most this many orders or cancels per signed action
+MAX_BATCH_SIZE = 50
+
+# Upper bound on the orders or cancels a single batch command will send
+MAX_BATCH_COMMAND_SIZE = 1000
+
+def load_json_arg(value):
+    """Load a JSON list argument given inline, as a file path, or as "-" for stdin"""
+    if value == "-":
+        if _serving:
+            raise ValueError("Reading JSON from stdin is not supported in daemon mode")
+        items = json_loads(sys.stdin.buffer.read())
+    elif value.lstrip().startswith(("[", "{")):
+        items = json_loads(value)
+    else:
+        with open(value, "rb") as f:
+            items = json_loads(f.read())
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON list")
+    return items
+
+def streams_json_arg(value):
+    """Whether a JSON list argument is parsed incrementally rather than loaded whole"""
+    return ijson is not None and not value.lstrip().startswith(("[", "{"))
+
+def stream_json_list(f):
+    """Yield the items of a JSON list read incrementally from a binary file"""
+    events = ijson.parse(f, use_float=True)
+    first = next(events, None)
+    if first is None or first[1] != "start_array":
+        raise ValueError("Expected a JSON list")
+    yield from ijson.items(itertools.chain([first], events), "item")
+
+def iter_json_list_arg(value):
+    """Yield the items of a JSON list argument, at most MAX_BATCH_COMMAND_SIZE of them.
+    
+    Stdin and files are parsed incrementally when ijson is available.
+    """
+    def items():
+        if not streams_json_arg(value):
+            yield from load_json_arg(value)
+        elif value == "-":
+            if _serving:
+                raise ValueError("Reading JSON from stdin is not supported in daemon mode")
+            yield from stream_json_list(sys.stdin.buffer)
+        else:
+            with open(value, "rb") as f:
+                yield from stream_json_list(f)
+    
+    for count, item in enumerate(items(), 1):
+        if count > MAX_BATCH_COMMAND_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_COMMAND_SIZE} entries are accepted per command")
+        yield item
+
+def iter_batches(items, size=MAX_BATCH_SIZE):
+    """Group an iterable into consecutive lists of at most size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+@exchange_action
+def send_bulk_orders(args, exchange, batch, builder):
+    """Sign and send one bulk order action"""
+    return exchange.bulk_orders(batch, builder)
+
+@exchange_action
+def send_bulk_cancels(args, exchange, batch, by_cloid):
+    """Sign and send one bulk cancel action"""
+    if by_cloid:
+        return exchange.bulk_cancel_by_cloid(batch)
+    return exchange.bulk_cancel(batch)
+
+def json_bool(value, name):
+    """Read a boolean field given as a JSON boolean or, like the command line flags, as a "true" or "false" string"""
+    if isinstance(value, bool):
+        return value
+    if value in ("true", "false"):
+        return value == "true"
+    raise ValueError(f"{name} must be true or false, got {value!r}")
+
+def order_request(order):
+    """Convert a JSON order object to the SDK's OrderRequest"""
+    if not isinstance(order, dict):
+        raise ValueError(f"Order must be an object: {order!r}")
+    try:
+        return {
+            "coin": order["coin"],
+            "is_buy": json_bool(order["is_buy"], "is_buy"),
+            "sz": float(order["sz"]),
+            "limit_px": float(order["limit_px"]),
+            "order_type": order["order_type"],
+            "reduce_only": json_bool(order.get("reduce_only", False), "reduce_only"),
+            "cloid": Cloid(order["cloid"]) if order.get("cloid") else None,
+        }
+    except KeyError as e:
+        raise ValueError(f"Order is missing {e}: {order}")
+
+def cancel_request(cancel):
+    """Convert a JSON cancel object to the SDK's CancelRequest or CancelByCloidRequest"""
+    if not isinstance(cancel, dict):
+        raise ValueError(f"Cancel must be an object: {cancel!r}")
+    try:
+        if cancel.get("cloid"):
+            return {"coin": cancel["coin"], "cloid": Cloid(cancel["cloid"])}
+        return {"coin": cancel["coin"], "oid": int(cancel["oid"])}
+    except KeyError as e:
+        raise ValueError(f"Cancel is missing {e}: {cancel}")
+
+def place_orders_batch(args):
+    """Place several orders, signing up to MAX_BATCH_SIZE of them per bulk action.
+    
+    Inline lists are checked in full before anything is sent. Streamed lists are sent
+    batch by batch as they are read, so a bad entry or an oversized list is only found
+    after earlier batches went out.
+    
+    Returns a generator yielding one response per action, followed by an {"error": ...}
+    entry if the remaining orders could not be read or sent.
+    """
+    builder = None
+    if args.builder:
+        builder = parse_json(args.builder)
+    
+    orders = map(order_request, iter_json_list_arg(args.orders_json))
+    if not streams_json_arg(args.orders_json):
+        orders = list(orders)
+    
+    def send():
+        try:
+            for batch in iter_batches(orders):
+                yield send_bulk_orders(args, batch, builder)
+        except Exception as e:
+            yield {"error": str(e)}
     
+    return send()
+
+def cancel_orders_batch(args):
+    """Cancel several orders by oid or cloid, up to MAX_BATCH_SIZE per bulk action.
+    
+    Every cancel is read and checked before the first action is sent. If an action
+    fails, the responses already received are returned followed by an {"error": ...} entry.
+    """
+    by_oid = []
+    by_cloid = []
+    for cancel in map(cancel_request, iter_json_list_arg(args.cancels_json)):
+        if "cloid" in cancel:
+            by_cloid.append(cancel)
+        else:
+            by_oid.append(cancel)
+    
+    results = []
+    try:
+        for batch in iter_batches(by_oid):
+            results.append(send_bulk_cancels(args, batch, False))
+        for batch in iter_batches(by_cloid):
+            results.append(send_bulk_cancels(args, batch, True))
+    except Exception as e:
+        results.append({"error": str(e)})
+    return results
+
+@exchange_action
+def update_leverage(args, exchange):
+    """Update leverage for a coin"""
     return exchange.update_leverage(
         int(args.leverage),
         args.coin,
         args.is_cross == "true"
     )
 
-def main():
-    parser = argparse.ArgumentParser(description="Hyperliquid SDK Bridge")
+class BridgeArgumentParser(argparse.ArgumentParser):
+    """ArgumentParser that writes help and usage to stderr, keeping stdout for JSON results"""
+    
+    def print_help(self, file=None):
+        super().print_help(sys.stderr)
+    
+    def print_usage(self, file=None):
+        super().print_usage(sys.stderr)
+
+def build_parser():
+    """Build the command line parser shared by one-shot and daemon modes"""
+    parser = BridgeArgumentParser(description="Hyperliquid SDK Bridge")
     subparsers = parser.add_subparsers(dest="command", help="Command to execute")
     
+    # Daemon command
+    subparsers.add_parser("daemon", help="Serve newline-delimited JSON requests from stdin")
+    
     # Common arguments
-    common_parser = argparse.ArgumentParser(add_help=False)
+    common_parser = BridgeArgumentParser(add_help=False)
     common_parser.add_argument("--secret-key", required=True, help="Private key for signing transactions")
     common_parser.add_argument("--network", default="mainnet", choices=["mainnet", "testnet"], help="Network to connect to")
     common_parser.add_argument("--account-address", help="Account address (if different from the wallet address)")
     
+    # Cache statistics command
+    subparsers.add_parser("cache-stats", help="Report in-process cache statistics")
+    
     # Market data command
     market_data_parser = subparsers.add_parser("market-data", parents=[common_parser], help="Get market data")
     market_data_parser.add_argument("--data-type", required=True, help="Type of market data to retrieve")
@@ -168,6 +1088,22 @@ def main():
     user_data_parser.add_argument("--start-time", type=int, help="Start time in milliseconds")
     user_data_parser.add_argument("--end-time", type=int, help="End time in milliseconds")
     
+    # Subscribe command
+    subscribe_parser = subparsers.add_parser("subscribe", parents=[common_parser], help="Stream market data over websocket (daemon mode only)")
+    subscribe_parser.add_argument("--data-type", required=True, choices=["all_mids", "l2_snapshot"], help="Type of market data to stream")
+    subscribe_parser.add_argument("--coin", help="Coin symbol (required for l2_snapshot)")
+    
+    # Bulk prices command
+    prices_bulk_parser = subparsers.add_parser("prices-bulk", parents=[common_parser], help="Get mid prices for several coins")
+    prices_bulk_parser.add_argument("--coins", required=True, help="Comma-separated coin symbols")
+    
+    # Account snapshot command
+    subparsers.add_parser("account-snapshot", parents=[common_parser], help="Get positions, balance and margin in one query")
+    
+    # Batched data command
+    info_batch_parser = subparsers.add_parser("info-batch", parents=[common_parser], help="Run several data queries concurrently")
+    info_batch_parser.add_argument("--requests-json", required=True, help="JSON list of {command, data_type, coin, interval, start_time, end_time} objects")
+    
     # Place order command
     place_order_parser = subparsers.add_parser("place-order", parents=[common_parser], help="Place an order")
     place_order_parser.add_argument("--coin", required=True, help="Coin symbol")
@@ -195,33 +1131,194 @@ def main():
     cancel_order_parser.add_argument("--oid", help="Order ID")
     cancel_order_parser.add_argument("--cloid", help="Client order ID")
     
+    # Batched place orders command
+    place_orders_batch_parser = subparsers.add_parser("place-orders-batch", parents=[common_parser], help="Place several orders in bulk actions")
+    place_orders_batch_parser.add_argument("--orders-json", required=True, help="JSON list of {coin, is_buy, sz, limit_px, order_type, reduce_only, cloid} objects, inline, as a file path, or - for stdin; results are written one line per bulk action")
+    place_orders_batch_parser.add_argument("--builder", help="Builder info as JSON string")
+    
+    # Batched cancel orders command
+    cancel_orders_batch_parser = subparsers.add_parser("cancel-orders-batch", parents=[common_parser], help="Cancel several orders in bulk actions")
+    cancel_orders_batch_parser.add_argument("--cancels-json", required=True, help="JSON list of {coin, oid} or {coin, cloid} objects, inline, as a file path, or - for stdin")
+    
     # Update leverage command
     update_leverage_parser = subparsers.add_parser("update-leverage", parents=[common_parser], help="Update leverage")
     update_leverage_parser.add_argument("--coin", required=True, help="Coin symbol")
     update_leverage_parser.add_argument("--leverage", required=True, help="Leverage value")
     update_leverage_parser.add_argument("--is-cross", default="true", choices=["true", "false"], help="Whether to use cross margin")
     
-    args = parser.parse_args()
+    return parser
+
+# Command name -> handler, for every subcommand except daemon
+COMMANDS = {
+    "market-data": get_market_data,
+    "cache-stats": get_cache_stats,
+    "user-data": get_user_data,
+    "subscribe": subscribe_market_data,
+    "prices-bulk": get_prices_bulk,
+    "account-snapshot": get_account_snapshot,
+    "info-batch": get_data_batch,
+    "place-order": place_order,
+    "market-order": place_market_order,
+    "cancel-order": cancel_order,
+    "place-orders-batch": place_orders_batch,
+    "cancel-orders-batch": cancel_orders_batch,
+    "update-leverage": update_leverage,
+}
+
+# Built once at import so daemon requests only pay for parsing
+PARSER = build_parser()
+
+def run_command(args):
+    """Execute a parsed command and return its result"""
+    handler = COMMANDS.get(args.command)
+    if handler is None:
+        return {"error": "Unknown command"}
+    return handler(args)
+
+KEEPALIVE_INTERVAL = 30
+
+def keep_alive():
+    """Periodically query meta on each network in use so pooled TLS connections stay warm"""
+    while True:
+        time.sleep(KEEPALIVE_INTERVAL)
+        # Exchange-only daemons never create a read-only Info, so each client's own Info is pinged too
+        with _clients_lock:
+            infos = {network: exchange.info for (_, network, _), (_, exchange) in _clients.items()}
+            infos.update(_infos)
+        for network, info in infos.items():
+            try:
+                ttl = META_CACHE_POLICY["meta"][0]
+                _meta_cache[(network, "meta")] = (time.monotonic(), info.meta(), ttl)
+            except Exception:
+                pass
+
+COMPACT_INTERVAL = 60
+
+def compact_caches():
+    """Periodically drop cache entries older than ten times their TTL, bounding daemon memory"""
+    while True:
+        time.sleep(COMPACT_INTERVAL)
+        now = time.monotonic()
+        for name, cache, ttl_of in (
+            ("meta", _meta_cache, lambda entry: entry[2]),
+            ("all_mids", _all_mids_cache, lambda entry: ALL_MIDS_TTL),
+            ("user_state", _state_cache, lambda entry: USER_STATE_TTL),
+        ):
+            for key, entry in list(cache.items()):
+                if now - entry[0] > 10 * ttl_of(entry) and cache.get(key) is entry:
+                    del cache[key]
+                    _cache_stats[name]["evictions"] += 1
+        
+        # Drop idle locks of addresses with no cached state, including those whose fetch failed;
+        # get_user_state retries when the lock it waited on was dropped
+        with _state_locks_lock:
+            for key, lock in list(_state_locks.items()):
+                if key not in _state_cache and not lock.locked():
+                    del _state_locks[key]
+
+class Shutdown(BaseException):
+    """Raised from signal handlers to stop the daemon loop, past per-request error handling"""
+
+def handle_shutdown_signal(signum, frame):
+    """Stop serving on SIGTERM or SIGINT"""
+    raise Shutdown()
+
+def close_connections():
+    """Close websocket feeds and pooled HTTP connections"""
+    for ws_info in list(_ws_infos.values()):
+        try:
+            ws_info.disconnect_websocket()
+        except Exception:
+            pass
+    _batch_executor.shutdown(wait=False)
+    _session.close()
+
+def boot_stagger():
+    """Get the maximum startup delay in seconds from HL_BOOT_STAGGER, ignoring invalid values"""
+    value = os.environ.get("HL_BOOT_STAGGER") or "0"
+    try:
+        stagger = float(value)
+    except ValueError:
+        stagger = math.nan
+    if not math.isfinite(stagger) or stagger < 0:
+        print(f"Ignoring invalid HL_BOOT_STAGGER: {value!r}", file=sys.stderr)
+        return 0
+    return stagger
+
+# Requests handled at once in daemon mode, so a slow call or a 429 backoff does not hold up the rest
+MAX_CONCURRENT_REQUESTS = 8
+
+def handle_request(line):
+    """Run one daemon request line and write its response"""
+    request_id = None
+    try:
+        request = json_loads(line)
+        request_id = request.get("id")
+        args = PARSER.parse_args(request["argv"])
+        # Epoch time in milliseconds after which no exchange action for this request may be sent or executed
+        args.deadline = request.get("deadline")
+        result = run_command(args)
+        if isinstance(result, types.GeneratorType):
+            result = list(result)
+    except SystemExit:
+        result = {"error": "Invalid arguments"}
+    except Exception as e:
+        result = {"error": str(e)}
+    write_response(request_id, result)
+
+def serve():
+    """Serve requests from stdin until EOF.
     
+    Each request is a JSON line {"id": ..., "argv": [...], "deadline": ...}, where argv is
+    the argument list accepted on the command line and the optional deadline is the epoch
+    time in milliseconds after which no exchange action for the request may be sent or executed.
+    Each response is a JSON line {"id": ..., "result": ...}.
+    Requests run concurrently, so responses may arrive in a different order than requests.
+    """
+    global _serving, _response_out
+    _serving = True
+    # The SDK prints unexpected websocket messages, e.g. for a feed that was just unsubscribed
+    _response_out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS)
+    signal.signal(signal.SIGTERM, handle_shutdown_signal)
+    signal.signal(signal.SIGINT, handle_shutdown_signal)
     try:
-        if args.command == "market-data":
-            result = get_market_data(args)
-        elif args.command == "user-data":
-            result = get_user_data(args)
-        elif args.command == "place-order":
-            result = place_order(args)
-        elif args.command == "market-order":
-            result = place_market_order(args)
-        elif args.command == "cancel-order":
-            result = cancel_order(args)
-        elif args.command == "update-leverage":
-            result = update_leverage(args)
-        else:
-            result = {"error": "Unknown command"}
+        # Spread out reconnects when many daemons restart at once
+        stagger = boot_stagger()
+        if stagger > 0:
+            time.sleep(random.uniform(0, stagger))
         
-        print(json.dumps(result))
+        threading.Thread(target=keep_alive, daemon=True).start()
+        threading.Thread(target=compact_caches, daemon=True).start()
+        for line in sys.stdin.buffer:
+            if line.strip():
+                executor.submit(handle_request, line)
+        # Answer every request already read before closing connections
+        executor.shutdown(wait=True)
+    except Shutdown:
+        executor.shutdown(wait=False, cancel_futures=True)
+    finally:
+        close_connections()
+
+def main():
+    args = PARSER.parse_args()
+    install_signing_cache()
+    
+    if args.command == "daemon":
+        serve()
+        return
+    
+    try:
+        result = run_command(args)
+        if isinstance(result, types.GeneratorType):
+            # Streamed results are written as newline-delimited JSON as they arrive
+            for item in result:
+                write_json(item)
+        else:
+            write_json(result)
     except Exception as e:
-        print(json.dumps({"error": str(e)}))
+        write_json({"error": str(e)})
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -10,7 +10,7 @@ import {
   McpError,
   ReadResourceRequestSchema,
 } from '@modelcontextprotocol/sdk/types.js';
-import { PythonShell } from 'python-shell';
+import { PythonShell, Options } from 'python-shell';
 import path from 'path';
 import { fileURLToPath } from 'url';
 
@@ -30,32 +30,85 @@ if (!SECRET_KEY) {
   throw new Error('HYPERLIQUID_SECRET_KEY environment variable is required');
 }
 
-// Helper function to run the Python bridge script
-async function runBridgeScript(command: string, args: Record<string, any>) {
-  const options = {
-    mode: 'text',
+// Long-lived Python bridge process, spawned on first use and reused for every call
+let bridge: PythonShell | null = null;
+let nextRequestId = 0;
+const pendingRequests = new Map<number, { resolve: (value: any) => void; reject: (reason: any) => void; timer: NodeJS.Timeout }>();
+
+// How long a call may wait for its response before it is failed
+const BRIDGE_REQUEST_TIMEOUT_MS = 120_000;
+
+// How long the bridge may keep sending exchange actions for a call, including 429 backoff between
+// bulk actions. Actions are signed with this deadline as expiresAfter, so the exchange rejects any
+// that arrive later, however long HTTP retries took; the margin absorbs clock skew with the exchange
+const BRIDGE_ACTION_DEADLINE_MS = 100_000;
+
+// Remove a pending request and stop its timer, returning it if it was still waiting
+function takePendingRequest(id: number) {
+  const pending = pendingRequests.get(id);
+  if (!pending) return undefined;
+  pendingRequests.delete(id);
+  clearTimeout(pending.timer);
+  return pending;
+}
+
+// Helper function to get (or spawn) the Python bridge daemon
+function getBridge(): PythonShell {
+  if (bridge) return bridge;
+
+  const options: Options = {
+    mode: 'json',
     pythonPath: 'python3',
     pythonOptions: ['-u'], // unbuffered output
     scriptPath: __dirname,
-    args: [
-      command,
-      '--secret-key', SECRET_KEY as string, // Type assertion since we check it's defined above
-      '--network', NETWORK,
-      ...(ACCOUNT_ADDRESS ? ['--account-address', ACCOUNT_ADDRESS] : []),
-      ...Object.entries(args).flatMap(([key, value]) => {
-        if (value === undefined || value === null) return [];
-        return [`--${key.replace(/([A-Z])/g, '-$1').toLowerCase()}`, String(value)];
-      })
-    ]
+    args: ['daemon']
   };
 
-  try {
-    const result = await PythonShell.run(BRIDGE_SCRIPT_PATH, options);
-    return JSON.parse(result[0]);
-  } catch (error) {
+  const shell = new PythonShell(path.basename(BRIDGE_SCRIPT_PATH), options);
+  shell.on('message', (message) => {
+    takePendingRequest(message.id)?.resolve(message.result);
+  });
+  shell.on('stderr', (line) => console.error('[Python bridge]', line));
+  shell.on('error', (error: Error & { data?: string }) => {
     console.error('Error running Python bridge script:', error);
-    throw error;
-  }
+    // A response line that fails to parse still starts with the id of its request
+    const match = typeof error.data === 'string' ? /^\{"id":(\d+),/.exec(error.data) : null;
+    if (match) {
+      takePendingRequest(Number(match[1]))?.reject(new Error(`Invalid response from Python bridge: ${error.message}`));
+    }
+  });
+  shell.on('close', () => {
+    bridge = null;
+    for (const id of [...pendingRequests.keys()]) {
+      takePendingRequest(id)?.reject(new Error('Python bridge exited'));
+    }
+  });
+
+  bridge = shell;
+  return shell;
+}
+
+// Helper function to run a command through the Python bridge
+async function runBridgeScript(command: string, args: Record<string, any>) {
+  const argv = [
+    command,
+    '--secret-key', SECRET_KEY as string, // Type assertion since we check it's defined above
+    '--network', NETWORK,
+    ...(ACCOUNT_ADDRESS ? ['--account-address', ACCOUNT_ADDRESS] : []),
+    ...Object.entries(args).flatMap(([key, value]) => {
+      if (value === undefined || value === null) return [];
+      return [`--${key.replace(/([A-Z])/g, '-$1').toLowerCase()}`, String(value)];
+    })
+  ];
+
+  const id = nextRequestId++;
+  return new Promise<any>((resolve, reject) => {
+    const timer = setTimeout(() => {
+      takePendingRequest(id)?.reject(new Error(`Python bridge did not answer ${command} within ${BRIDGE_REQUEST_TIMEOUT_MS / 1000}s`));
+    }, BRIDGE_REQUEST_TIMEOUT_MS);
+    pendingRequests.set(id, { resolve, reject, timer });
+    getBridge().send({ id, argv, deadline: Date.now() + BRIDGE_ACTION_DEADLINE_MS });
+  });
 }
 
 class HyperliquidServer {
@@ -79,6 +132,7 @@ class HyperliquidServer {
     this.server.onerror = (error) => console.error('[MCP Error]', error);
 
     process.on('SIGINT', async () => {
+      bridge?.end(() => {});
       await this.server.close();
       process.exit(0);
     });
@@ -270,6 +324,76 @@ class HyperliquidServer {
             required: ['dataType']
           }
         },
+        {
+          name: 'get_account_snapshot',
+          description: 'Get positions, account balance and margin summary from Hyperliquid in one call',
+          inputSchema: {
+            type: 'object',
+            properties: {}
+          }
+        },
+        {
+          name: 'get_prices',
+          description: 'Get current mid prices for several coins in one call',
+          inputSchema: {
+            type: 'object',
+            properties: {
+              coins: {
+                type: 'array',
+                description: 'Coin symbols',
+                items: {
+                  type: 'string'
+                }
+              }
+            },
+            required: ['coins']
+          }
+        },
+        {
+          name: 'get_data_batch',
+          description: 'Run several market or user data queries concurrently in one call',
+          inputSchema: {
+            type: 'object',
+            properties: {
+              requests: {
+                type: 'array',
+                description: 'Queries to run; results are returned in the same order',
+                items: {
+                  type: 'object',
+                  properties: {
+                    command: {
+                      type: 'string',
+                      description: 'Kind of query (default: market-data)',
+                      enum: ['market-data', 'user-data']
+                    },
+                    dataType: {
+                      type: 'string',
+                      description: 'Data type, as accepted by get_market_data or get_user_data'
+                    },
+                    coin: {
+                      type: 'string',
+                      description: 'Coin symbol'
+                    },
+                    interval: {
+                      type: 'string',
+                      description: 'Candle interval'
+                    },
+                    startTime: {
+                      type: 'integer',
+                      description: 'Start time in milliseconds'
+                    },
+                    endTime: {
+                      type: 'integer',
+                      description: 'End time in milliseconds'
+                    }
+                  },
+                  required: ['dataType']
+                }
+              }
+            },
+            required: ['requests']
+          }
+        },
         {
           name: 'place_limit_order',
           description: 'Place a limit order on Hyperliquid',
@@ -365,6 +489,87 @@ class HyperliquidServer {
             ]
           }
         },
+        {
+          name: 'place_limit_orders',
+          description: 'Place several limit orders on Hyperliquid in bulk',
+          inputSchema: {
+            type: 'object',
+            properties: {
+              orders: {
+                type: 'array',
+                description: 'Orders to place',
+                items: {
+                  type: 'object',
+                  properties: {
+                    coin: {
+                      type: 'string',
+                      description: 'Coin symbol'
+                    },
+                    isBuy: {
+                      type: 'boolean',
+                      description: 'Whether the order is a buy'
+                    },
+                    size: {
+                      type: 'number',
+                      description: 'Order size'
+                    },
+                    price: {
+                      type: 'number',
+                      description: 'Order price'
+                    },
+                    timeInForce: {
+                      type: 'string',
+                      description: 'Time in force',
+                      enum: ['Gtc', 'Ioc', 'Alo']
+                    },
+                    reduceOnly: {
+                      type: 'boolean',
+                      description: 'Whether the order is reduce-only'
+                    },
+                    clientOrderId: {
+                      type: 'string',
+                      description: 'Client order ID'
+                    }
+                  },
+                  required: ['coin', 'isBuy', 'size', 'price', 'timeInForce']
+                }
+              }
+            },
+            required: ['orders']
+          }
+        },
+        {
+          name: 'cancel_orders',
+          description: 'Cancel several orders on Hyperliquid in bulk',
+          inputSchema: {
+            type: 'object',
+            properties: {
+              orders: {
+                type: 'array',
+                description: 'Orders to cancel',
+                items: {
+                  type: 'object',
+                  properties: {
+                    coin: {
+                      type: 'string',
+                      description: 'Coin symbol'
+                    },
+                    orderId: {
+                      type: 'integer',
+                      description: 'Order ID'
+                    },
+                    clientOrderId: {
+                      type: 'string',
+                      description: 'Client order ID'
+                    }
+                  },
+                  required: ['coin']
+                }
+              }
+            },
+            required: ['orders']
+          }
+        },
         {
           name: 'update_leverage',
           description: 'Update leverage for a coin',
@@ -417,6 +622,32 @@ class HyperliquidServer {
             });
             break;
           }
+          case 'get_account_snapshot': {
+            result = await runBridgeScript('account-snapshot', {});
+            break;
+          }
+          case 'get_prices': {
+            if (!args) throw new Error('Arguments are required');
+            result = await runBridgeScript('prices-bulk', {
+              coins: (args.coins as string[]).join(',')
+            });
+            break;
+          }
+          case 'get_data_batch': {
+            if (!args) throw new Error('Arguments are required');
+            const queries = (args.requests as any[]).map((query) => ({
+              command: query.command,
+              data_type: query.dataType,
+              coin: query.coin,
+              interval: query.interval,
+              start_time: query.startTime,
+              end_time: query.endTime
+            }));
+            result = await runBridgeScript('info-batch', {
+              requestsJson: JSON.stringify(queries)
+            });
+            break;
+          }
           case 'place_limit_order': {
             if (!args) throw new Error('Arguments are required');
             const orderType = JSON.stringify({
@@ -455,6 +686,35 @@ class HyperliquidServer {
             });
             break;
           }
+          case 'place_limit_orders': {
+            if (!args) throw new Error('Arguments are required');
+            const orders = (args.orders as any[]).map((order) => ({
+              coin: order.coin,
+              // Passed through unchanged so the bridge rejects anything but a boolean or "true"/"false"
+              is_buy: order.isBuy,
+              sz: order.size,
+              limit_px: order.price,
+              order_type: { limit: { tif: order.timeInForce } },
+              reduce_only: order.reduceOnly ?? false,
+              cloid: order.clientOrderId
+            }));
+            result = await runBridgeScript('place-orders-batch', {
+              ordersJson: JSON.stringify(orders)
+            });
+            break;
+          }
+          case 'cancel_orders': {
+            if (!args) throw new Error('Arguments are required');
+            const cancels = (args.orders as any[]).map((order) => ({
+              coin: order.coin,
+              oid: order.orderId,
+              cloid: order.clientOrderId
+            }));
+            result = await runBridgeScript('cancel-orders-batch', {
+              cancelsJson: JSON.stringify(cancels)
+            });
+            break;
+          }
           case 'update_leverage': {
             if (!args) throw new Error('Arguments are required');
             result = await runBridgeScript('update-leverage', {
@@ -480,6 +740,12 @@ class HyperliquidServer {
           };
         }
 
+        // Bulk order and cancel commands return a list and report a failed action as an {"error": ...}
+        // entry in it, after the responses of any actions that were already sent. info-batch lists hold
+        // independent per-query results, so one failed query does not fail the call.
+        const batchFailed = (name === 'place_limit_orders' || name === 'cancel_orders')
+          && Array.isArray(result) && result.some((entry) => entry && entry.error);
+
         return {
           content: [
             {
@@ -487,6 +753,7 @@ class HyperliquidServer {
               text: JSON.stringify(result, null, 2),
             },
           ],
+          ...(batchFailed ? { isError: true } : {}),
         };
       } catch (error) {
         console.error(`Error executing tool ${name}:`, error);